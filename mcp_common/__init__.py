@@ -0,0 +1,17 @@
+from .base_server import (
+    BATCH_EXECUTE_TOOL,
+    GET_COIN_PRICE_TOOL,
+    BaseConfig,
+    BaseMCPServer,
+    run,
+    setup_logging,
+)
+
+__all__ = [
+    "BATCH_EXECUTE_TOOL",
+    "GET_COIN_PRICE_TOOL",
+    "BaseConfig",
+    "BaseMCPServer",
+    "run",
+    "setup_logging",
+]
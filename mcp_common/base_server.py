@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Dict, List
+
+import aiohttp
+import orjson
+import uvicorn
+import yarl
+from mcp.server.lowlevel import Server
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# Configuration
+class BaseConfig:
+    PORT = int(os.environ.get("PORT", 8000))
+    COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+    HTTP_TIMEOUT = 10  # seconds, whole request
+    HTTP_CONNECT_TIMEOUT = 3  # seconds
+    WARMUP_TIMEOUT = 2  # seconds per upstream host
+    PRICE_CACHE_TTL = float(os.environ.get("PRICE_CACHE_TTL", 5))  # seconds
+    PRICE_BATCH_WINDOW = 0.01  # seconds to collect lookups into one request
+    PRICE_BATCH_MAX_IDS = 50  # ids per upstream request, keeps the URL bounded
+    MAX_COIN_ID_LENGTH = 100
+    COINGECKO_MAX_CONCURRENCY = 8  # simultaneous requests to CoinGecko
+    MAX_RETRY_AFTER = 30  # seconds, cap on honouring a 429 Retry-After
+    LOG_LEVEL = logging.INFO
+    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOGGER_NAME = "mcp-server"
+
+def setup_logging(config: type[BaseConfig]) -> logging.Logger:
+    """Configures and returns the logger named by the given config."""
+    logger = logging.getLogger(config.LOGGER_NAME)
+    logger.setLevel(config.LOG_LEVEL)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
+        logger.addHandler(handler)
+    return logger
+
+# Shared Tool Definitions
+GET_COIN_PRICE_TOOL = {
+    "name": "get_coin_price",
+    "description": "Gets the current price of a coin from CoinGecko.",
+    "inputSchema": {
+        "type": "object",
+        "properties": {
+            "coin_id": {
+                "type": "string",
+                "description": "The CoinGecko ID of the coin (e.g., bitcoin, ethereum)."
+            }
+        },
+        "required": ["coin_id"]
+    }
+}
+
+BATCH_EXECUTE_TOOL = {
+    "name": "batch_execute",
+    "description": "Runs several tool calls concurrently and returns all results in one response.",
+    "inputSchema": {
+        "type": "object",
+        "properties": {
+            "operations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name of the tool to call."
+                        },
+                        "arguments": {
+                            "type": "object",
+                            "description": "Arguments for the tool call."
+                        }
+                    },
+                    "required": ["name"]
+                },
+                "description": "List of tool calls to execute."
+            },
+            "maxConcurrent": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "Maximum number of operations running at once (default 5)."
+            },
+            "stopOnError": {
+                "type": "boolean",
+                "description": "Skip operations that have not started once one fails (default false)."
+            }
+        },
+        "required": ["operations"]
+    }
+}
+
+# MCP Server Implementation
+class BaseMCPServer:
+    """Shared HTTP session, price lookup and SSE transport for the MCP servers.
+
+    Subclasses set ``config`` and ``tools`` and extend ``_dispatch`` and
+    ``_upstream_urls`` for any tools of their own.
+    """
+
+    __slots__ = (
+        "server",
+        "logger",
+        "_session",
+        "_price_cache",
+        "_price_inflight",
+        "_cache_ttl",
+        "_pending_prices",
+        "_flush_handle",
+        "_flush_tasks",
+        "_coingecko_sem",
+        "_price_url",
+    )
+
+    config: type[BaseConfig] = BaseConfig
+    tools: List[Dict[str, Any]] = [GET_COIN_PRICE_TOOL, BATCH_EXECUTE_TOOL]
+
+    def __init__(self):
+        self.server = None
+        self.logger = setup_logging(self.config)
+        self._session: aiohttp.ClientSession | None = None
+        self._price_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+        self._price_inflight: Dict[str, asyncio.Future] = {}
+        self._cache_ttl = self.config.PRICE_CACHE_TTL
+        self._pending_prices: Dict[str, asyncio.Future] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._coingecko_sem = asyncio.Semaphore(self.config.COINGECKO_MAX_CONCURRENCY)
+        # Parsed once; each lookup only swaps in the ids query parameter.
+        self._price_url = yarl.URL(f"{self.config.COINGECKO_API_URL}/simple/price").with_query(vs_currencies="usd")
+
+    async def get_coin_price(self, coin_id: str) -> Dict[str, Any]:
+        """Returns the current price of a coin, served from a short-lived cache when fresh."""
+        entry = self._price_cache.get(coin_id)
+        if entry and time.monotonic() - entry[0] < self._cache_ttl:
+            return entry[1]
+
+        # Concurrent callers for the same coin share a single upstream request.
+        inflight = self._price_inflight.get(coin_id)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_coin_price(coin_id))
+            self._price_inflight[coin_id] = inflight
+            inflight.add_done_callback(lambda _: self._price_inflight.pop(coin_id, None))
+        return await asyncio.shield(inflight)
+
+    async def _fetch_coin_price(self, coin_id: str) -> Dict[str, Any]:
+        """Queues a coin for the next batched CoinGecko request and waits for its price."""
+        loop = asyncio.get_running_loop()
+        future = self._pending_prices[coin_id] = loop.create_future()
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.config.PRICE_BATCH_WINDOW, self._flush_prices)
+        return await future
+
+    def _flush_prices(self):
+        """Sends every queued coin lookup to CoinGecko in as few requests as possible."""
+        pending, self._pending_prices = self._pending_prices, {}
+        self._flush_handle = None
+        task = asyncio.ensure_future(self._resolve_prices(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve_prices(self, pending: Dict[str, asyncio.Future]):
+        """Fetches prices for a flushed batch, caching them and waking the waiting callers."""
+        coin_ids = list(pending)
+        size = self.config.PRICE_BATCH_MAX_IDS
+        chunks = await asyncio.gather(
+            *(self.get_coin_prices(coin_ids[i:i + size]) for i in range(0, len(coin_ids), size))
+        )
+        prices = {coin_id: price for chunk in chunks for coin_id, price in chunk.items()}
+        now = time.monotonic()
+        for coin_id, future in pending.items():
+            result = {"price": prices.get(coin_id)}
+            if result["price"] is not None:
+                self._price_cache[coin_id] = (now, result)
+            if not future.done():
+                future.set_result(result)
+
+    async def get_coin_prices(self, coin_ids: List[str]) -> Dict[str, Any]:
+        """Fetches the current USD prices of several coins from CoinGecko in one request."""
+        url = self._price_url.update_query(ids=",".join(coin_ids))
+        self.logger.info("Fetching prices for %s from %s", coin_ids, url)
+        try:
+            async with self._coingecko_sem:
+                async with self._session.get(url) as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        prices = {coin_id: data.get(coin_id, {}).get("usd") for coin_id in coin_ids}
+                        missing = [coin_id for coin_id, price in prices.items() if price is None]
+                        if missing:
+                            self.logger.warning("Could not retrieve USD price for %s", missing)
+                        return prices
+                    self.logger.error("Error fetching prices for %s: %s", coin_ids, response.status)
+                    retry_after = await self._retry_after(response)
+                # Back off with the connection released but the upstream slot still held.
+                await asyncio.sleep(retry_after)
+                return {coin_id: None for coin_id in coin_ids}
+        except Exception as e:
+            self.logger.exception("Error fetching prices for %s: %s", coin_ids, e)
+            return {coin_id: None for coin_id in coin_ids}
+
+    async def _retry_after(self, response: aiohttp.ClientResponse) -> float:
+        """Returns how long to back off after a failed response, draining it so the connection can be reused."""
+        await response.read()
+        if response.status != 429:
+            return 0
+        try:
+            delay = float(response.headers.get("Retry-After", 1))
+        except ValueError:  # HTTP-date form; fall back to a short pause
+            delay = 1
+        return min(max(delay, 0), self.config.MAX_RETRY_AFTER)
+
+    async def batch_execute(self, operations: List[Dict[str, Any]], max_concurrent: int = 5,
+                            stop_on_error: bool = False) -> List[Dict[str, Any]]:
+        """Runs several tool calls concurrently, preserving the order of results."""
+        sem = asyncio.Semaphore(max_concurrent)
+        failed = asyncio.Event()
+
+        async def run_op(op: Any) -> Dict[str, Any]:
+            name = op.get("name") if isinstance(op, dict) else None
+            async with sem:
+                if stop_on_error and failed.is_set():
+                    return {"name": name, "error": "skipped after an earlier error"}
+                try:
+                    if not isinstance(op, dict):
+                        raise ValueError("operation must be an object")
+                    arguments = op.get("arguments") or {}
+                    if not isinstance(name, str):
+                        raise ValueError("operation name must be a string")
+                    if not isinstance(arguments, dict):
+                        raise ValueError("operation arguments must be an object")
+                    if name == "batch_execute":
+                        raise ValueError("batch_execute cannot be nested")
+                    return {"name": name, "result": await self._dispatch(name, arguments)}
+                except Exception as e:
+                    failed.set()
+                    return {"name": name, "error": str(e)}
+
+        return await asyncio.gather(*(run_op(op) for op in operations))
+
+    async def _dispatch(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Runs a single tool call and returns its raw result."""
+        if name == "get_coin_price":
+            coin_id = arguments.get("coin_id")
+            if not coin_id:
+                raise ValueError("coin_id is required")
+            if not isinstance(coin_id, str) or "," in coin_id or len(coin_id) > self.config.MAX_COIN_ID_LENGTH:
+                raise ValueError("coin_id must be a single CoinGecko ID")
+            return await self.get_coin_price(coin_id)
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+
+    def _upstream_urls(self) -> List[str]:
+        """URLs requested at startup to warm each upstream host."""
+        return [f"{self.config.COINGECKO_API_URL}/ping"]
+
+    async def initialize(self) -> Server:
+        if self._session is None or self._session.closed:
+            # Only a couple of upstream hosts are used, so bound per host rather than in total.
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=32,
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+                happy_eyeballs_delay=0.1,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.HTTP_TIMEOUT, connect=self.config.HTTP_CONNECT_TIMEOUT),
+                headers={"Accept": "application/json"},
+            )
+        self.server = self._create_server()
+        return self.server
+
+    async def _warmup(self):
+        """Opens a keepalive connection to each upstream host before serving traffic."""
+        async def ping(url: str):
+            try:
+                async with self._session.head(url, timeout=aiohttp.ClientTimeout(total=self.config.WARMUP_TIMEOUT)):
+                    pass
+            except Exception as e:
+                self.logger.warning("Warmup request to %s failed: %r", url, e)
+
+        await asyncio.gather(*(ping(url) for url in self._upstream_urls()))
+
+    @asynccontextmanager
+    async def _lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        await self._warmup()
+        try:
+            yield
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        """Closes the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _list_tools(self) -> List[Dict[str, Any]]:
+        return self.tools
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if name == "batch_execute":
+            operations = arguments.get("operations")
+            if not operations:
+                raise ValueError("operations is required")
+            if not isinstance(operations, list):
+                raise ValueError("operations must be a list")
+            max_concurrent = arguments.get("maxConcurrent", 5)
+            if isinstance(max_concurrent, bool) or not isinstance(max_concurrent, int) or max_concurrent < 1:
+                raise ValueError("maxConcurrent must be a positive integer")
+            stop_on_error = arguments.get("stopOnError", False)
+            if not isinstance(stop_on_error, bool):
+                raise ValueError("stopOnError must be a boolean")
+            results = await self.batch_execute(operations, max_concurrent=max_concurrent, stop_on_error=stop_on_error)
+            return [{"type": "text", "text": orjson.dumps(results).decode()}]
+        result = await self._dispatch(name, arguments)
+        return [{"type": "text", "text": orjson.dumps(result).decode()}]
+
+    def _create_server(self) -> Server:
+        app = Server(self.config.LOGGER_NAME)
+        app.list_tools()(self._list_tools)
+        app.call_tool()(self._call_tool)
+        return app
+
+    async def run_sse(self, port: int):
+        if not self.server:
+            await self.initialize()
+
+        messages_path = "/messages/"
+        sse = SseServerTransport(messages_path)
+
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+                await self.server.run(streams[0], streams[1], self.server.create_initialization_options())
+
+        starlette_app = Starlette(
+            debug=True,
+            routes=[
+                Route("/sse", endpoint=handle_sse),
+                Mount("/messages/", app=sse.handle_post_message),
+            ],
+            lifespan=self._lifespan,
+        )
+
+        self.logger.info("Starting SSE server on port %s", port)
+        config = uvicorn.Config(starlette_app, host="0.0.0.0", port=port)
+        server = uvicorn.Server(config)
+        await server.serve()
+
+def run(main: Coroutine[Any, Any, None]):
+    """Runs the entrypoint coroutine on uvloop when it is available."""
+    if uvloop:
+        uvloop.run(main)
+    else:
+        asyncio.run(main)